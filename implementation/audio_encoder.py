@@ -4,9 +4,71 @@ Implements OFDM-based audio data transmission
 """
 
 import numpy as np
+import scipy.fft
 from typing import List, Tuple
 from enum import Enum
+import functools
+import math
 import struct
+from fractions import Fraction
+
+try:
+    from numba import njit
+except ImportError:  # Optional: pure Python/NumPy fallbacks are used instead
+    njit = None
+
+
+def _build_crc16_table(poly: int = 0x1021) -> List[int]:
+    """Build the 256-entry lookup table for a MSB-first CRC-16"""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = (crc << 1) ^ poly
+            else:
+                crc = crc << 1
+            crc &= 0xFFFF
+        table.append(crc)
+    return table
+
+
+_CRC16_TABLE = _build_crc16_table()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cupy():
+    """Return the cupy module if a CUDA device is usable, else None"""
+    try:
+        import cupy
+        if cupy.cuda.runtime.getDeviceCount() > 0:
+            return cupy
+    except Exception:  # Optional: not installed or no CUDA runtime/device
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=8)
+def _time_vector(samples: int, sample_rate: int) -> np.ndarray:
+    """Shared read-only time base of `samples` samples at `sample_rate`"""
+    t = np.arange(samples) / sample_rate
+    t.flags.writeable = False
+    return t
+
+
+def _pack_symbol_indices(bit_array, bits_per_symbol, count):
+    """Pack consecutive groups of bits (MSB first) into symbol indices"""
+    indices = np.zeros(count, dtype=np.int64)
+    for i in range(count):
+        value = 0
+        for j in range(bits_per_symbol):
+            value = (value << 1) | bit_array[i * bits_per_symbol + j]
+        indices[i] = value
+    return indices
+
+
+if njit is not None:
+    _pack_symbol_indices = njit(cache=True)(_pack_symbol_indices)
 
 
 class ModulationType(Enum):
@@ -27,7 +89,8 @@ class AudioEncoder:
                  carrier_start: float = 2500.0,
                  carrier_spacing: float = 250.0,
                  modulation: ModulationType = ModulationType.QPSK,
-                 packet_duration: float = 0.05):  # 50ms packets
+                 packet_duration: float = 0.05,  # 50ms packets
+                 fast_fft: bool = False):
         """
         Args:
             sample_rate: Audio sampling rate (Hz)
@@ -36,6 +99,11 @@ class AudioEncoder:
             carrier_spacing: Spacing between carriers (Hz)
             modulation: Modulation scheme
             packet_duration: Duration of each audio packet (seconds)
+            fast_fft: Opt-in: round the IFFT size up to the next
+                      bin-exact length with only small prime factors. Only
+                      worth it when the default size has a large prime
+                      factor; carriers stay on their nominal frequencies
+                      either way
         """
         self.sample_rate = sample_rate
         self.num_subcarriers = num_subcarriers
@@ -55,25 +123,72 @@ class AudioEncoder:
             for i in range(num_subcarriers)
         ])
         
-        # Precompute carrier waves
-        t = np.arange(self.samples_per_symbol) / sample_rate
-        self.carrier_waves = np.array([
-            np.exp(2j * np.pi * freq * t)
-            for freq in self.carrier_freqs
-        ])
+        # FFT bin of each subcarrier. The IFFT size is chosen so every
+        # carrier frequency falls exactly on a bin; the IFFT output trimmed
+        # to samples_per_symbol is then the nominal carriers, unchanged
+        self.fft_size = self._carrier_fft_size(fast_fft)
+        self.carrier_bins = np.round(
+            self.carrier_freqs * self.fft_size / sample_rate
+        ).astype(int)
+        if (len(np.unique(self.carrier_bins)) != num_subcarriers
+                or self.carrier_bins.max() >= self.fft_size // 2):
+            raise ValueError("Subcarriers must be distinct and below the Nyquist frequency")
+        
+        # Constellation lookup table indexed by symbol value
+        bits_per_symbol = modulation.value
+        self.constellation_lut = np.array([
+            self._value_to_symbol(value)
+            for value in range(2 ** bits_per_symbol)
+        ], dtype=np.complex64)
+        self._bit_weights = 1 << np.arange(bits_per_symbol - 1, -1, -1)
+        
+        # Preamble and sync word are identical for every packet
+        self._preamble = self._generate_preamble().astype(np.float32)
+        self._sync = self._generate_sync_word().astype(np.float32)
+        
+        # Fixed sample offsets of each packet section
+        self._sync_offset = len(self._preamble)
+        self._header_offset = self._sync_offset + len(self._sync)
+        
+    def _carrier_fft_size(self, fast_fft: bool) -> int:
+        """
+        Smallest IFFT size of at least samples_per_symbol on which every
+        carrier frequency is an exact bin
+        
+        Carrier k sits on bin k * fft_size / sample_rate, which is a whole
+        number for all carriers exactly when fft_size is a multiple of the
+        denominators of carrier_start / sample_rate and carrier_spacing /
+        sample_rate (e.g. 192 for 250 Hz steps at 48 kHz).
+        """
+        step = 1
+        for freq in (self.carrier_start, self.carrier_spacing):
+            ratio = Fraction(freq).limit_denominator(1000) / self.sample_rate
+            step = step * ratio.denominator // math.gcd(step, ratio.denominator)
+            
+        fft_size = -(-self.samples_per_symbol // step) * step
+        if fast_fft:
+            # Next exact size with only small prime factors
+            while scipy.fft.next_fast_len(fft_size) != fft_size:
+                fft_size += step
+        return fft_size
         
     def _generate_preamble(self) -> np.ndarray:
         """Generate chirp preamble for timing synchronization"""
         duration = 0.005  # 5ms chirp
         samples = int(self.sample_rate * duration)
         
-        t = np.arange(samples) / self.sample_rate
-        
         # Linear chirp from carrier_start to carrier_start + bandwidth
         f0 = self.carrier_start
         f1 = self.carrier_freqs[-1]
         
-        chirp = np.sin(2 * np.pi * (f0 * t + (f1 - f0) * t**2 / (2 * duration)))
+        # Accumulate the per-sample phase step (taken at the sample midpoint
+        # so the running sum matches the continuous quadratic phase)
+        sweep = (np.arange(samples - 1) + 0.5) / samples
+        dphi = 2 * np.pi * (f0 + (f1 - f0) * sweep) / self.sample_rate
+        phase = np.zeros(samples)
+        np.cumsum(dphi, out=phase[1:])
+        
+        chirp = np.sin(phase)
         
         # Apply window to reduce sidelobes
         window = np.hanning(samples)
@@ -90,7 +205,7 @@ class AudioEncoder:
         pilot_freqs = self.carrier_freqs[::4]  # Every 4th carrier
         sequence = [1, 1, 1, -1, -1, 1, -1]  # Barker-7
         
-        t = np.arange(samples) / self.sample_rate
+        t = _time_vector(samples, self.sample_rate)
         sync = np.zeros(samples)
         
         for i, freq in enumerate(pilot_freqs[:len(sequence)]):
@@ -112,31 +227,21 @@ class AudioEncoder:
         Returns:
             8 bytes of header data
         """
-        header = bytearray(8)
-        header[0:3] = frame_id.to_bytes(3, 'big')
-        header[3:5] = packet_seq.to_bytes(2, 'big')
-        header[5] = payload_type & 0xFF
+        # 24-bit frame ID (top byte of the packed uint32 dropped), 16-bit seq, type
+        header = struct.pack('>IHB', frame_id & 0xFFFFFF, packet_seq, payload_type & 0xFF)[1:]
         
         # CRC-16
-        crc = self._calculate_crc16(header[:6])
-        header[6:8] = crc.to_bytes(2, 'big')
+        crc = self._calculate_crc16(header)
         
-        return bytes(header)
+        return struct.pack('>6sH', header, crc)
         
     def _calculate_crc16(self, data: bytes) -> int:
-        """Simple CRC-16 implementation"""
+        """Table-driven CRC-16/CCITT (poly 0x1021, init 0xFFFF)"""
+        # Plain Python: for a 6-byte header this beats any array/JIT call overhead
+        table = _CRC16_TABLE
         crc = 0xFFFF
-        poly = 0x1021
-        
         for byte in data:
-            crc ^= (byte << 8)
-            for _ in range(8):
-                if crc & 0x8000:
-                    crc = (crc << 1) ^ poly
-                else:
-                    crc = crc << 1
-                crc &= 0xFFFF
-                
+            crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
         return crc
         
     def _modulate_symbols(self, bits: bytes) -> np.ndarray:
@@ -146,25 +251,24 @@ class AudioEncoder:
         Returns:
             Complex symbol values for each subcarrier
         """
-        symbols = np.zeros(self.num_subcarriers, dtype=complex)
+        symbols = np.zeros(self.num_subcarriers, dtype=np.complex64)
         
-        bit_string = ''.join(format(b, '08b') for b in bits)
         bits_per_symbol = self.modulation.value
-        
-        for i in range(self.num_subcarriers):
-            start_bit = i * bits_per_symbol
-            end_bit = start_bit + bits_per_symbol
-            
-            if end_bit <= len(bit_string):
-                symbol_bits = bit_string[start_bit:end_bit]
-                symbols[i] = self._bits_to_symbol(symbol_bits)
+        bit_array = np.unpackbits(np.frombuffer(bits, dtype=np.uint8))
+        
+        # Only subcarriers with a complete bit group are modulated
+        count = min(self.num_subcarriers, len(bit_array) // bits_per_symbol)
+        if njit is not None:
+            indices = _pack_symbol_indices(bit_array, bits_per_symbol, count)
+        else:
+            groups = bit_array[:count * bits_per_symbol].reshape(count, bits_per_symbol)
+            indices = groups @ self._bit_weights
+        symbols[:count] = self.constellation_lut[indices]
                 
         return symbols
         
-    def _bits_to_symbol(self, bits: str) -> complex:
-        """Convert bit string to complex symbol (constellation point)"""
-        value = int(bits, 2)
-        
+    def _value_to_symbol(self, value: int) -> complex:
+        """Convert integer symbol value to complex symbol (constellation point)"""
         if self.modulation == ModulationType.BPSK:
             # BPSK: 0 → +1, 1 → -1
             return 1.0 if value == 0 else -1.0
@@ -186,31 +290,103 @@ class AudioEncoder:
             Q = (value & 0x3) * 2 - 3          # Quadrature
             return (I + 1j * Q) / np.sqrt(10)
             
-    def _ofdm_modulate(self, symbols: np.ndarray) -> np.ndarray:
+    def _ofdm_modulate(self,
+                       symbols: np.ndarray,
+                       out: np.ndarray = None,
+                       workers: int = None) -> np.ndarray:
         """
         Modulate symbols onto carriers using OFDM
         
+        Args:
+            symbols: Complex symbol values for each subcarrier, or a batch
+                     of shape (..., num_ofdm_symbols, num_subcarriers)
+            out: Optional buffer to write the samples into; each row of a
+                 batch is flattened and truncated to the row length of out
+            workers: Number of scipy.fft worker threads (-1 = all cores)
+            
         Returns:
-            Real-valued audio samples
+            Real-valued, unnormalized audio samples (one row per OFDM symbol
+            for batches); encode_packet scales the whole OFDM section once
         """
-        audio = np.zeros(self.samples_per_symbol, dtype=float)
-        
-        for i, symbol in enumerate(symbols):
-            # Multiply symbol by carrier wave
-            modulated = symbol * self.carrier_waves[i]
-            audio += modulated.real  # Take real part
+        # Place symbols on their carrier bins and synthesize with one IFFT
+        spectrum = np.zeros(symbols.shape[:-1] + (self.fft_size,), dtype=np.complex64)
+        spectrum[..., self.carrier_bins] = symbols
+        audio = scipy.fft.ifft(spectrum, axis=-1, workers=workers)
+        audio = audio[..., :self.samples_per_symbol].real * np.float32(self.fft_size)
+        
+        if out is not None:
+            rows = audio.reshape(out.shape[:-1] + (-1,))
+            out[...] = rows[..., :out.shape[-1]]
+            return out
             
-        # Normalize
-        audio = audio / np.max(np.abs(audio)) * 0.7
-        
         return audio
         
+    def _ofdm_modulate_gpu(self, symbols: np.ndarray, cp) -> np.ndarray:
+        """GPU variant of _ofdm_modulate using CuPy; returns host float32 samples"""
+        spectrum = cp.zeros(symbols.shape[:-1] + (self.fft_size,), dtype=cp.complex64)
+        spectrum[..., cp.asarray(self.carrier_bins)] = cp.asarray(symbols)
+        audio = cp.fft.ifft(spectrum, axis=-1)
+        audio = audio[..., :self.samples_per_symbol].real * np.float32(self.fft_size)
+        return audio.astype(cp.float32).get()
+        
     def _add_cyclic_prefix(self, ofdm_symbol: np.ndarray, prefix_ratio: float = 0.1) -> np.ndarray:
         """Add cyclic prefix to combat multipath interference"""
         prefix_len = int(len(ofdm_symbol) * prefix_ratio)
         prefix = ofdm_symbol[-prefix_len:]
         return np.concatenate([prefix, ofdm_symbol])
         
+    def _modulate_blocks(self, blocks: np.ndarray) -> np.ndarray:
+        """
+        Modulate a batch of equally sized byte blocks onto subcarriers
+        
+        Args:
+            blocks: (num_blocks, bytes_per_block) uint8 array
+            
+        Returns:
+            (num_blocks, num_subcarriers) complex symbol values
+        """
+        symbols = np.zeros((len(blocks), self.num_subcarriers), dtype=np.complex64)
+        
+        bits_per_symbol = self.modulation.value
+        bit_array = np.unpackbits(blocks, axis=1)
+        
+        # Only subcarriers with a complete bit group are modulated
+        count = min(self.num_subcarriers, bit_array.shape[1] // bits_per_symbol)
+        groups = bit_array[:, :count * bits_per_symbol].reshape(len(blocks), count, bits_per_symbol)
+        symbols[:, :count] = self.constellation_lut[groups @ self._bit_weights]
+        
+        return symbols
+        
+    def _packet_symbols(self,
+                        payload: bytes,
+                        frame_id: int,
+                        packet_seq: int,
+                        payload_type: int) -> np.ndarray:
+        """
+        Modulate header and payload into one row of symbols per OFDM symbol
+        
+        Returns:
+            (num_ofdm_symbols, num_subcarriers) complex symbol values
+        """
+        # Symbols past the packet duration would be truncated anyway
+        available = max(0, self.samples_per_packet - self._header_offset)
+        max_blocks = (available + self.samples_per_symbol - 1) // self.samples_per_symbol
+        
+        # Header (8ms - 2 OFDM symbols)
+        header = self._encode_header(frame_id, packet_seq, payload_type)
+        rows = [self._modulate_symbols(block) for block in (header[:4], header[4:8])]
+        
+        # Payload (multiple OFDM symbols to fill 30ms), zero padded to whole blocks
+        bits_per_symbol_set = (self.num_subcarriers * self.modulation.value) // 8
+        payload = payload[:max(0, max_blocks - 2) * bits_per_symbol_set]
+        pad_len = (-len(payload)) % bits_per_symbol_set
+        
+        if payload:
+            blocks = np.frombuffer(payload + b'\x00' * pad_len, dtype=np.uint8)
+            rows.extend(self._modulate_blocks(blocks.reshape(-1, bits_per_symbol_set)))
+            
+        return np.array(rows[:max_blocks], dtype=np.complex64).reshape(-1, self.num_subcarriers)
+        
     def encode_packet(self,
                       payload: bytes,
                       frame_id: int = 0,
@@ -228,53 +404,87 @@ class AudioEncoder:
         Returns:
             Audio samples as float array (-1.0 to +1.0)
         """
-        # 1. Generate preamble (5ms)
-        preamble = self._generate_preamble()
-        
-        # 2. Generate sync word (2ms)
-        sync = self._generate_sync_word()
-        
-        # 3. Encode header (8ms - 2 OFDM symbols)
-        header = self._encode_header(frame_id, packet_seq, payload_type)
-        header_symbols1 = self._modulate_symbols(header[:4])
-        header_symbols2 = self._modulate_symbols(header[4:8])
-        
-        header_audio1 = self._ofdm_modulate(header_symbols1)
-        header_audio2 = self._ofdm_modulate(header_symbols2)
+        return self.encode_packets_batch(
+            [payload], [frame_id], [packet_seq], payload_type, use_gpu=False
+        )[0]
+        
+    def encode_packets_batch(self,
+                             payloads: List[bytes],
+                             frame_ids: List[int] = None,
+                             packet_seqs: List[int] = None,
+                             payload_type: int = 0x01,
+                             use_gpu: bool = True) -> np.ndarray:
+        """
+        Encode many audio packets at once (e.g. for pre-recorded transmissions)
         
-        # 4. Encode payload (multiple OFDM symbols to fill 30ms)
-        payload_audio = []
-        bits_per_symbol_set = (self.num_subcarriers * self.modulation.value) // 8
+        All OFDM symbols of all packets are synthesized with one batched
+        IFFT, on the GPU via CuPy when available, otherwise with threaded
+        scipy.fft on the CPU.
         
-        for i in range(0, len(payload), bits_per_symbol_set):
-            chunk = payload[i:i + bits_per_symbol_set]
-            # Pad if necessary
-            if len(chunk) < bits_per_symbol_set:
-                chunk = chunk + b'\x00' * (bits_per_symbol_set - len(chunk))
+        Args:
+            payloads: Data to transmit, one entry per packet
+            frame_ids: Visual frame ID per packet (default 0)
+            packet_seqs: Packet sequence number per packet (default 0)
+            payload_type: Type of payload shared by all packets
+            use_gpu: Use CuPy if it is installed and a CUDA device is present
+            
+        Returns:
+            Audio samples as float array of shape (len(payloads), samples_per_packet)
+            
+        Raises:
+            ValueError: If frame_ids or packet_seqs differ in length from payloads
+        """
+        num_packets = len(payloads)
+        frame_ids = frame_ids if frame_ids is not None else [0] * num_packets
+        packet_seqs = packet_seqs if packet_seqs is not None else [0] * num_packets
+        if len(frame_ids) != num_packets or len(packet_seqs) != num_packets:
+            raise ValueError(
+                f"Got {num_packets} payloads, {len(frame_ids)} frame_ids and "
+                f"{len(packet_seqs)} packet_seqs; lengths must match"
+            )
+        
+        # Output buffer sized to the exact packet duration (zero padded)
+        packets = np.zeros((num_packets, self.samples_per_packet), dtype=np.float32)
+        end = self.samples_per_packet
+        
+        # 1. Preamble (5ms)
+        packets[:, :self._sync_offset] = self._preamble[:end]
+        
+        # 2. Sync word (2ms)
+        packets[:, self._sync_offset:self._header_offset] = \
+            self._sync[:max(0, end - self._sync_offset)]
+        
+        # 3. Header and payload symbols, one row per OFDM symbol
+        rows = [
+            self._packet_symbols(payload, frame_id, packet_seq, payload_type)
+            for payload, frame_id, packet_seq in zip(payloads, frame_ids, packet_seqs)
+        ]
+        num_blocks = max((len(packet_rows) for packet_rows in rows), default=0)
+        if num_blocks == 0:
+            return packets
+            
+        # Unused rows stay zero and synthesize to silence
+        symbols = np.zeros((num_packets, num_blocks, self.num_subcarriers), dtype=np.complex64)
+        for p, packet_rows in enumerate(rows):
+            symbols[p, :len(packet_rows)] = packet_rows
                 
-            symbols = self._modulate_symbols(chunk)
-            audio = self._ofdm_modulate(symbols)
-            payload_audio.append(audio)
+        # 4. Modulate all OFDM symbols with one batched IFFT
+        stop = self._header_offset + num_blocks * self.samples_per_symbol
+        ofdm = packets[:, self._header_offset:stop]
+        cp = _get_cupy() if use_gpu else None
+        
+        if cp is not None:
+            audio = self._ofdm_modulate_gpu(symbols, cp)
+            ofdm[...] = audio.reshape(num_packets, -1)[:, :ofdm.shape[1]]
+        else:
+            workers = -1 if num_packets > 1 else None
+            self._ofdm_modulate(symbols, out=ofdm, workers=workers)
             
-        payload_audio = np.concatenate(payload_audio) if payload_audio else np.array([])
-        
-        # 5. Combine all parts
-        packet = np.concatenate([
-            preamble,
-            sync,
-            header_audio1,
-            header_audio2,
-            payload_audio
-        ])
+        # 5. Normalize each packet's OFDM section once
+        peak = np.max(np.abs(ofdm), axis=1, keepdims=True)
+        ofdm *= np.float32(0.7) / np.maximum(peak, np.float32(1e-9))
         
-        # 6. Pad or truncate to exact packet duration
-        target_samples = self.samples_per_packet
-        if len(packet) < target_samples:
-            packet = np.concatenate([packet, np.zeros(target_samples - len(packet))])
-        elif len(packet) > target_samples:
-            packet = packet[:target_samples]
-            
-        return packet.astype(np.float32)
+        return packets
         
         
 class PacketType:
@@ -343,7 +553,9 @@ class AudioPacketBuilder:
         
 
 # Example usage
-if __name__ == "__main__":
+def _demo():
+    """Encode a test packet, save it as WAV and plot its spectrum"""
+    # Visualization/IO dependencies are only needed for the demo
     import matplotlib.pyplot as plt
     from scipy.io import wavfile
     
@@ -390,3 +602,7 @@ if __name__ == "__main__":
     plt.tight_layout()
     plt.savefig("audio_packet_analysis.png")
     print("Saved spectrum analysis to audio_packet_analysis.png")
+
+
+if __name__ == "__main__":
+    _demo()
@@ -0,0 +1,78 @@
+"""
+HVATP Color Palettes
+Palette tables shared by the visual encoder and decoder
+"""
+
+import numpy as np
+
+
+# Palettes indexed by module value, by number of colors. Colors are in
+# OpenCV's BGR channel order, as displayed by cv2.imshow and classified
+# through cv2.COLOR_BGR2LAB; the names below are the colors on screen.
+#
+# Values are
+# assigned so that colors which are close in CIELAB (and so most likely to
+# be confused by the camera) differ in as few bits as possible: every
+# color's nearest neighbor is one bit away, so a nearest-color mistake
+# costs a single bit error. The assignment was found once by brute force
+# over all orderings (black fixed at 0), minimizing the sum of Hamming
+# distance / CIELAB distance^2 over all color pairs.
+#
+# Changing these tables changes the over-the-air format: encoder and
+# decoder must use the same version.
+PALETTES = {
+    8: np.array([
+        [0, 0, 0],       # 0 Black
+        [255, 255, 255], # 1 White
+        [255, 0, 0],     # 2 Blue
+        [255, 255, 0],   # 3 Cyan
+        [0, 0, 255],     # 4 Red
+        [0, 255, 255],   # 5 Yellow
+        [255, 0, 255],   # 6 Magenta
+        [0, 255, 0],     # 7 Green
+    ], dtype=np.uint8),
+    4: np.array([
+        [0, 0, 0],       # 0 Black
+        [255, 255, 255], # 1 White
+        [255, 0, 0],     # 2 Blue
+        [0, 0, 255],     # 3 Red
+    ], dtype=np.uint8),
+    2: np.array([
+        [0, 0, 0],       # 0 Black
+        [255, 255, 255], # 1 White
+    ], dtype=np.uint8),
+}
+for _palette in PALETTES.values():
+    _palette.flags.writeable = False
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+
+def ordered_palette(colors: int) -> np.ndarray:
+    """
+    Palette for the given number of colors, indexed by module value
+    
+    Args:
+        colors: Number of colors (2, 4, or 8)
+    
+    Returns:
+        Read-only (colors, 3) uint8 palette, BGR
+    """
+    return PALETTES[colors]
+
+
+def color_index(colors: int, color: tuple) -> int:
+    """Module value that renders as `color` in the given palette"""
+    palette = ordered_palette(colors)
+    return int(np.flatnonzero((palette == np.array(color)).all(axis=1))[0])
+
+
+def black_index(colors: int) -> int:
+    """Module value for black (finder, timing and metadata patterns)"""
+    return color_index(colors, BLACK)
+
+
+def white_index(colors: int) -> int:
+    """Module value for white (finder, timing and metadata patterns)"""
+    return color_index(colors, WHITE)
@@ -7,12 +7,16 @@ import numpy as np
 import cv2
 import time
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Import our modules
 from visual_encoder import VisualEncoder, EncodingMode, FrameSequenceEncoder
 from visual_decoder import VisualDecoder
 from audio_encoder import AudioEncoder, AudioPacketBuilder, ModulationType, PacketType
 
+# Minimum interval between progress lines, keeps console I/O out of the frame loop
+STATUS_INTERVAL = 0.25  # seconds
+
 
 class HVATPSender:
     """Complete sender implementation"""
@@ -48,6 +52,7 @@ class HVATPSender:
         self.frames_sent = 0
         self.bytes_sent = 0
         self.start_time = None
+        self._last_print = 0.0
         
     def send_file(self, filepath: str, display_window: str = "HVATP Transfer"):
         """
@@ -80,42 +85,61 @@ class HVATPSender:
         
         # Display frames
         print("📺 Starting transmission...")
-        for frame_id, frame in enumerate(visual_frames):
-            # Render for display
-            display_frame = self.visual_encoder.render_for_display(
-                frame, scale=self.display_scale
-            )
-            
-            # Show frame
-            cv2.imshow(display_window, display_frame)
-            
-            # Generate accompanying audio packet (ACK request)
-            audio_packet = self.audio_builder.build_ack_packet(
-                frame_id=frame_id,
-                ack_bitmap=0xFFFFFFFFFFFFFFFF  # Expecting all ACKs
-            )
-            
-            # In real implementation: play audio_packet through speaker
-            # For demo: just acknowledge packet was generated
-            
-            # Update stats
-            self.frames_sent += 1
-            frame_bytes = len(data) // len(visual_frames)
-            self.bytes_sent += frame_bytes
-            
-            # Display progress
-            elapsed = time.time() - self.start_time
-            throughput = self.bytes_sent / elapsed if elapsed > 0 else 0
-            
-            print(f"Frame {frame_id+1}/{len(visual_frames)} | "
-                  f"Throughput: {throughput/1024:.1f} KB/s | "
-                  f"Elapsed: {elapsed:.1f}s", end='\r')
+        
+        # Two reusable display buffers: one on screen, one being rendered
+        display_buffers = []
+        if visual_frames:
+            height, width, channels = visual_frames[0].shape
+            display_buffers = [
+                np.empty((height * self.display_scale, width * self.display_scale, channels),
+                         dtype=np.uint8)
+                for _ in range(2)
+            ]
+        
+        # Prepare the next frame's display image and audio packet in a
+        # background thread while the current frame is on screen
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = None
+            if visual_frames:
+                pending = executor.submit(
+                    self._prepare_frame, 0, visual_frames[0], display_buffers[0]
+                )
             
-            # Wait for frame duration (30 fps = 33.3ms)
-            key = cv2.waitKey(33)
-            if key == ord('q'):
-                print("\n❌ Transfer cancelled by user")
-                break
+            for frame_id in range(len(visual_frames)):
+                display_frame, audio_packet = pending.result()
+                if frame_id + 1 < len(visual_frames):
+                    pending = executor.submit(
+                        self._prepare_frame, frame_id + 1, visual_frames[frame_id + 1],
+                        display_buffers[(frame_id + 1) % 2]
+                    )
+                
+                # Show frame
+                cv2.imshow(display_window, display_frame)
+                
+                # In real implementation: play audio_packet through speaker
+                # For demo: just acknowledge packet was generated
+                
+                # Update stats
+                self.frames_sent += 1
+                frame_bytes = len(data) // len(visual_frames)
+                self.bytes_sent += frame_bytes
+                
+                # Display progress (rate limited)
+                now = time.time()
+                if now - self._last_print >= STATUS_INTERVAL:
+                    self._last_print = now
+                    elapsed = now - self.start_time
+                    throughput = self.bytes_sent / elapsed if elapsed > 0 else 0
+                    
+                    print(f"Frame {frame_id+1}/{len(visual_frames)} | "
+                          f"Throughput: {throughput/1024:.1f} KB/s | "
+                          f"Elapsed: {elapsed:.1f}s", end='\r')
+                
+                # Wait for frame duration (30 fps = 33.3ms)
+                key = cv2.waitKey(33)
+                if key == ord('q'):
+                    print("\n❌ Transfer cancelled by user")
+                    break
         
         # Final stats
         elapsed = time.time() - self.start_time
@@ -127,6 +151,21 @@ class HVATPSender:
         print(f"📦 Frames sent: {self.frames_sent}")
         
         cv2.destroyAllWindows()
+        
+    def _prepare_frame(self, frame_id: int, frame: np.ndarray, display_buffer: np.ndarray = None):
+        """Render a visual frame for display and build its audio packet"""
+        # Render for display
+        display_frame = self.visual_encoder.render_for_display(
+            frame, scale=self.display_scale, out=display_buffer
+        )
+        
+        # Generate accompanying audio packet (ACK request)
+        audio_packet = self.audio_builder.build_ack_packet(
+            frame_id=frame_id,
+            ack_bitmap=0xFFFFFFFFFFFFFFFF  # Expecting all ACKs
+        )
+        
+        return display_frame, audio_packet
 
 
 class HVATPReceiver:
@@ -155,6 +194,7 @@ class HVATPReceiver:
         self.frames_decoded = 0
         self.frames_failed = 0
         self.start_time = None
+        self._last_print = 0.0
         
     def receive_from_camera(self, 
                            camera_id: int = 0,
@@ -212,16 +252,18 @@ class HVATPReceiver:
                     self.total_frames = result.total_frames
                     print(f"📊 Transfer started: {self.total_frames} frames expected")
                 
-                # Progress
+                # Progress (rate limited)
                 received_count = len(self.received_frames)
                 progress = (received_count / self.total_frames * 100) if self.total_frames else 0
                 
-                elapsed = time.time() - self.start_time
-                
-                print(f"✅ Frame {result.frame_id}/{self.total_frames} | "
-                      f"Progress: {progress:.1f}% | "
-                      f"Success rate: {self.visual_decoder.get_success_rate()*100:.1f}% | "
-                      f"Decode: {result.decode_time_ms:.1f}ms", end='\r')
+                now = time.time()
+                if now - self._last_print >= STATUS_INTERVAL:
+                    self._last_print = now
+                    
+                    print(f"✅ Frame {result.frame_id}/{self.total_frames} | "
+                          f"Progress: {progress:.1f}% | "
+                          f"Success rate: {self.visual_decoder.get_success_rate()*100:.1f}% | "
+                          f"Decode: {result.decode_time_ms:.1f}ms", end='\r')
                 
                 # Check if complete
                 if received_count == self.total_frames:
@@ -0,0 +1,56 @@
+"""
+Tests for the HVATP audio encoder
+"""
+
+import numpy as np
+import pytest
+
+from audio_encoder import AudioEncoder
+
+
+@pytest.fixture
+def encoder():
+    return AudioEncoder()
+
+
+def test_batch_rows_match_encode_packet(encoder):
+    payloads = [b"", b"\x01\x02\x03", bytes(range(40)), b"HVATP" * 20]
+    frame_ids = [0, 7, 0x123456, 42]
+    packet_seqs = [0, 1, 255, 3]
+
+    batch = encoder.encode_packets_batch(payloads, frame_ids, packet_seqs, use_gpu=False)
+
+    assert batch.shape == (len(payloads), encoder.samples_per_packet)
+    for row, payload, frame_id, packet_seq in zip(batch, payloads, frame_ids, packet_seqs):
+        np.testing.assert_allclose(
+            row, encoder.encode_packet(payload, frame_id, packet_seq), rtol=0, atol=1e-6
+        )
+
+
+@pytest.mark.parametrize("frame_ids, packet_seqs", [
+    ([1], [1, 2]),
+    ([1, 2], [1]),
+    ([1, 2, 3], [1, 2]),
+])
+def test_batch_rejects_mismatched_lengths(encoder, frame_ids, packet_seqs):
+    with pytest.raises(ValueError):
+        encoder.encode_packets_batch([b"a", b"b"], frame_ids, packet_seqs, use_gpu=False)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"packet_duration": 0.01},
+    {"sample_rate": 44100},
+    {"fast_fft": True},
+])
+def test_ofdm_symbol_is_nominal_carriers(kwargs):
+    encoder = AudioEncoder(**kwargs)
+    rng = np.random.default_rng(0)
+    symbols = encoder.constellation_lut[rng.integers(0, len(encoder.constellation_lut), encoder.num_subcarriers)]
+
+    # Direct synthesis at the nominal carrier frequencies
+    t = np.arange(encoder.samples_per_symbol) / encoder.sample_rate
+    expected = (symbols[:, None] * np.exp(2j * np.pi * encoder.carrier_freqs[:, None] * t)).real.sum(axis=0)
+
+    assert len(np.unique(encoder.carrier_bins)) == encoder.num_subcarriers
+    np.testing.assert_allclose(encoder._ofdm_modulate(symbols), expected, rtol=0, atol=1e-4)
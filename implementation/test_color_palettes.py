@@ -0,0 +1,50 @@
+"""
+Tests for the shared color palettes
+"""
+
+import numpy as np
+import pytest
+
+from color_palettes import ordered_palette, black_index, white_index
+from visual_encoder import VisualEncoder, EncodingMode
+from visual_decoder import VisualDecoder
+
+
+@pytest.mark.parametrize("colors", [4, 8])
+def test_nearest_colors_differ_by_one_bit(colors):
+    decoder = VisualDecoder(expected_module_count=30, error_correction_level=0.1)
+    lab = decoder._lab_palettes[colors]
+
+    for value in range(colors):
+        distances = ((lab - lab[value]) ** 2).sum(axis=1)
+        distances[value] = np.inf
+        nearest = int(distances.argmin())
+        assert bin(value ^ nearest).count('1') == 1
+
+
+@pytest.mark.parametrize("mode", list(EncodingMode))
+def test_all_values_round_trip(mode):
+    encoder = VisualEncoder(mode=mode, module_count=30, error_correction_level=0.1)
+    decoder = VisualDecoder(expected_module_count=30, error_correction_level=0.1)
+
+    # Cycle every module value through the data area
+    values = np.arange(len(encoder._data_slots)) % mode.colors
+    color_idx = np.full((30, 30), black_index(mode.colors), dtype=np.uint8)
+    color_idx[encoder._data_slots[:, 0], encoder._data_slots[:, 1]] = values
+    frame = encoder.color_palettes[mode][color_idx]
+
+    # Warped image at 2 pixels per module
+    warped = np.kron(frame, np.ones((2, 2, 1), dtype=np.uint8))
+    modules = decoder._extract_modules(warped, mode.colors)
+
+    np.testing.assert_array_equal(modules, values)
+
+
+@pytest.mark.parametrize("colors", [2, 4, 8])
+def test_encoder_and_decoder_share_palette(colors):
+    mode = {2: EncodingMode.ROBUST, 4: EncodingMode.BALANCED, 8: EncodingMode.HIGH_DENSITY}[colors]
+    encoder = VisualEncoder(mode=mode, module_count=30, error_correction_level=0.1)
+
+    np.testing.assert_array_equal(encoder.color_palettes[mode], ordered_palette(colors))
+    assert tuple(ordered_palette(colors)[black_index(colors)]) == (0, 0, 0)
+    assert tuple(ordered_palette(colors)[white_index(colors)]) == (255, 255, 255)
@@ -0,0 +1,158 @@
+"""
+Tests for the HVATP visual decoder
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from visual_decoder import VisualDecoder, RSCodec, ReedSolomonError, _cuda_available
+from visual_encoder import VisualEncoder, EncodingMode
+
+
+@pytest.fixture
+def decoder():
+    return VisualDecoder(expected_module_count=30, error_correction_level=0.1)
+
+
+def _codeword(decoder, seed=0, length=100):
+    rng = np.random.default_rng(seed)
+    message = bytearray(rng.integers(0, 256, length, dtype=np.uint8).tobytes())
+    return message, decoder.rs_codec.encode(message)
+
+
+def _corrupt(codeword, n_errors, seed=0):
+    rng = np.random.default_rng(seed)
+    corrupted = bytearray(codeword)
+    for pos in rng.choice(len(corrupted), n_errors, replace=False):
+        corrupted[pos] ^= int(rng.integers(1, 256))
+    return corrupted
+
+
+def test_rs_decode_clean_chunk(decoder):
+    message, codeword = _codeword(decoder)
+
+    decoded, error_count = decoder._rs_decode(bytearray(codeword))
+
+    assert decoded == message
+    assert error_count == 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rs_decode_correctable_chunk_matches_rscodec(decoder, seed):
+    message, codeword = _codeword(decoder, seed)
+    corrupted = _corrupt(codeword, decoder.rs_codec.nsym // 2, seed)
+
+    reference, _, errata_pos = RSCodec(decoder.rs_codec.nsym).decode(corrupted)
+    decoded, error_count = decoder._rs_decode(corrupted)
+
+    assert decoded == reference == message
+    assert error_count == len(errata_pos)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rs_decode_uncorrectable_chunk_returns_none(decoder, seed):
+    _, codeword = _codeword(decoder, seed)
+    corrupted = _corrupt(codeword, decoder.rs_codec.nsym // 2 + 3, seed)
+
+    with pytest.raises(ReedSolomonError):
+        RSCodec(decoder.rs_codec.nsym).decode(corrupted)
+    assert decoder._rs_decode(corrupted) is None
+
+
+def test_rs_decode_multiple_chunks(decoder):
+    message, codeword = _codeword(decoder, length=600)
+    corrupted = bytearray(codeword)
+    corrupted[3] ^= 0x5A
+    corrupted[300] ^= 0x01
+
+    decoded, error_count = decoder._rs_decode(corrupted)
+
+    assert decoded == message
+    assert error_count == 2
+
+
+def _synthetic_frame(mode=EncodingMode.BALANCED, module_count=30, scale=4, margin=40):
+    """Rendered code on a white margin, plus its four corners in the image"""
+    encoder = VisualEncoder(mode=mode, module_count=module_count, error_correction_level=0.1)
+    frame = encoder.encode_frame(bytes(range(256)), 1, 2)
+    image = cv2.copyMakeBorder(
+        encoder.render_for_display(frame, scale), margin, margin, margin, margin,
+        cv2.BORDER_CONSTANT, value=(255, 255, 255)
+    )
+    far = margin + module_count * scale
+    corners = [(margin, margin), (far, margin), (far, far), (margin, far)]
+    return image, corners
+
+
+def test_gpu_failure_falls_back_to_cpu(decoder, monkeypatch):
+    image, corners = _synthetic_frame()
+    cpu_decoder = VisualDecoder(expected_module_count=30, error_correction_level=0.1, use_gpu=False)
+
+    def out_of_memory(image):
+        raise cv2.error("out of memory")
+
+    for d in (decoder, cpu_decoder):
+        monkeypatch.setattr(d, "_detect_finder_patterns", lambda image: corners)
+    decoder.use_gpu = True
+    monkeypatch.setattr(decoder, "_upload", out_of_memory)
+
+    warped = decoder._locate_code(image)
+
+    assert warped is not None
+    np.testing.assert_array_equal(warped, cpu_decoder._locate_code(image))
+    decoder.decode_frame(image)  # Must not raise
+
+
+@pytest.mark.skipif(not _cuda_available(), reason="needs OpenCV with CUDA and a device")
+def test_gpu_front_end_matches_cpu(monkeypatch):
+    image, corners = _synthetic_frame()
+    decoder = VisualDecoder(expected_module_count=30, error_correction_level=0.1, use_gpu=True)
+    assert decoder.use_gpu
+
+    # Enhancement (CLAHE + median) agrees up to rounding
+    gpu_enhanced = decoder._enhance_image(decoder._upload(image)).download()
+    cpu_enhanced = decoder._enhance_image(image)
+    assert np.abs(gpu_enhanced.astype(int) - cpu_enhanced).mean() < 1.0
+
+    # Same corners in, same modules out
+    monkeypatch.setattr(decoder, "_detect_finder_patterns", lambda image: corners)
+    gpu_modules = decoder._extract_modules(decoder._front_end(decoder._upload(image)), 4)
+    cpu_modules = decoder._extract_modules(decoder._front_end(image), 4)
+    np.testing.assert_array_equal(gpu_modules, cpu_modules)
+
+
+@pytest.mark.parametrize("scale", [3, 6])
+def test_warp_cache_not_reused_after_small_move(decoder, scale):
+    image, corners = _synthetic_frame(scale=scale)
+    fresh = decoder._extract_modules(decoder._perspective_transform(image, corners), 4)
+
+    # Same frame again reuses the cached maps
+    assert np.array_equal(
+        decoder._extract_modules(decoder._perspective_transform(image, corners), 4), fresh
+    )
+
+    # Shift the code by 1-2 px; the corners follow and must not hit the cache
+    for shift in (1, 2):
+        moved = np.roll(image, shift, axis=(0, 1))
+        moved_corners = [(x + shift, y + shift) for x, y in corners]
+        modules = decoder._extract_modules(decoder._perspective_transform(moved, moved_corners), 4)
+        np.testing.assert_array_equal(modules, fresh)
+
+
+def test_decode_frames_keeps_worker_warp_caches(decoder, monkeypatch):
+    image, corners = _synthetic_frame()
+    monkeypatch.setattr(decoder, "_detect_finder_patterns", lambda image: corners)
+    map_builds = []
+    build_maps = cv2.initUndistortRectifyMap
+    monkeypatch.setattr(cv2, "initUndistortRectifyMap",
+                        lambda *args: map_builds.append(1) or build_maps(*args))
+
+    try:
+        decoder.decode_frames([image] * 4, max_workers=1)
+        decoder.decode_frames([image] * 4, max_workers=1)
+    finally:
+        decoder.close()
+
+    # One worker, one code position: the maps are built once for both batches
+    assert len(map_builds) == 1
@@ -5,9 +5,28 @@ Decodes JAB Code-based color QR codes from camera input
 
 import numpy as np
 import cv2
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, List
-from reedsolo import RSCodec
+try:
+    from creedsolo import (  # Cython build of reedsolo, much faster
+        RSCodec, ReedSolomonError, rs_calc_syndromes,
+        rs_find_error_locator, rs_find_errors, rs_correct_errata,
+    )
+except ImportError:
+    from reedsolo import (
+        RSCodec, ReedSolomonError, rs_calc_syndromes,
+        rs_find_error_locator, rs_find_errors, rs_correct_errata,
+    )
 from dataclasses import dataclass
+import functools
+from color_palettes import ordered_palette
+
+try:
+    from numba import njit
+except ImportError:  # Optional: the NumPy implementations are used instead
+    njit = None
 
 
 @dataclass
@@ -21,6 +40,73 @@ class DecodedFrame:
     decode_time_ms: float = 0.0
 
 
+@functools.lru_cache(maxsize=None)
+def _cuda_available() -> bool:
+    """True if OpenCV was built with the CUDA modules and sees a device"""
+    try:
+        return (cv2.cuda.getCudaEnabledDeviceCount() > 0
+                and hasattr(cv2.cuda, 'createTemplateMatching'))
+    except (AttributeError, cv2.error):  # Optional: CPU-only OpenCV build
+        return False
+
+
+def _extract_module_means(warped, reserved_mask, pixels_per_module):
+    """Average the crop window of every data module, in one pass over the image"""
+    module_count = reserved_mask.shape[0]
+    border = pixels_per_module // 5
+    channels = warped.shape[2]
+    window = (pixels_per_module - 2 * border) ** 2
+    
+    means = np.zeros((module_count * module_count, channels), dtype=np.float64)
+    count = 0
+    
+    for my in range(module_count):
+        for mx in range(module_count):
+            if reserved_mask[my, mx]:
+                continue
+                
+            # Mean color over the center of the module
+            y0 = my * pixels_per_module
+            x0 = mx * pixels_per_module
+            for y in range(y0 + border, y0 + pixels_per_module - border):
+                for x in range(x0 + border, x0 + pixels_per_module - border):
+                    for c in range(channels):
+                        means[count, c] += warped[y, x, c]
+            for c in range(channels):
+                means[count, c] /= window
+                
+            count += 1
+            
+    return means[:count]
+
+
+def _modules_to_bytes(modules, bits_per_module):
+    """Pack module values MSB first into complete bytes"""
+    n_bytes = len(modules) * bits_per_module // 8
+    data = np.empty(n_bytes, dtype=np.uint8)
+    
+    accumulator = 0
+    n_bits = 0
+    out = 0
+    for value in modules:
+        for shift in range(bits_per_module - 1, -1, -1):
+            accumulator = (accumulator << 1) | ((value >> shift) & 1)
+            n_bits += 1
+            if n_bits == 8:
+                data[out] = accumulator
+                out += 1
+                accumulator = 0
+                n_bits = 0
+                
+    return data
+
+
+if njit is not None:
+    # nogil so decode_frames workers can run the kernels concurrently
+    _extract_module_means = njit(cache=True, nogil=True)(_extract_module_means)
+    _modules_to_bytes = njit(cache=True, nogil=True)(_modules_to_bytes)
+
+
 class VisualDecoder:
     """
     Decodes JAB Code-like colored 2D barcodes from camera images
@@ -28,26 +114,109 @@ class VisualDecoder:
     
     def __init__(self,
                  expected_module_count: int = 200,
-                 error_correction_level: float = 0.35):
+                 error_correction_level: float = 0.35,
+                 use_gpu: bool = True):
         """
         Args:
             expected_module_count: Expected modules per side
             error_correction_level: ECC level matching encoder
+            use_gpu: Run enhancement, detection and warp on a CUDA device
+                     when OpenCV has one (falls back to CPU otherwise)
         """
         self.expected_module_count = expected_module_count
         self.ecc_level = error_correction_level
+        self.use_gpu = use_gpu and _cuda_available()
         
-        # Reed-Solomon decoder
+        # Reed-Solomon decoder. Built once and shared by all threads:
+        # reedsolo keeps its Galois field tables in module globals that
+        # every RSCodec() rebuilds, so none may be created while decoding
         total_symbols = self._calculate_total_symbols()
-        parity_symbols = int(total_symbols * error_correction_level)
-        self.rs_codec = RSCodec(parity_symbols)
+        self.parity_symbols = int(total_symbols * error_correction_level)
+        self.rs_codec = RSCodec(self.parity_symbols)
         
         # Detection parameters
         self.finder_pattern_size = 10
+        self.pixels_per_module = 2  # warp resolution; a little headroom over 1px for blur
+        self.finder_scales = [0.8, 1.0, 1.2]
+        
+        # Finder templates for multi-scale matching, built once
+        # (simplified - actual would be more complex)
+        template = self._create_finder_template()
+        self._finder_templates = [
+            cv2.resize(template,
+                       (int(self.finder_pattern_size * scale), int(self.finder_pattern_size * scale)),
+                       interpolation=cv2.INTER_AREA)
+            for scale in self.finder_scales
+        ]
+        
+        # Color palettes by number of colors
+        self._palettes = {
+            4: ordered_palette(4),
+            8: ordered_palette(8),
+        }
+        
+        # Grayscale intensity thresholds by number of levels (simple threshold-based)
+        self._intensity_thresholds = {
+            2: np.array([128]),
+            4: np.array([64, 128, 192]),
+            8: np.array([32, 64, 96, 128, 160, 192, 224]),
+        }
+        
+        # Palettes in CIELAB, where Euclidean distance tracks perceived color difference
+        self._lab_palettes = {
+            colors: self._to_lab(palette) for colors, palette in self._palettes.items()
+        }
+        
+        # Reserved (non-data) module positions, indexed [y, x]
+        self._reserved_mask = self._build_reserved_mask()
+        
+        # Warp maps are reused while the code stays put between frames: no
+        # corner may move more than this fraction of a module's width
+        self.corner_tolerance = 0.1
+        
+        # Per-thread decode state (warp map cache), see _thread_state
+        self._local = threading.local()
+        
+        # Worker pool for decode_frames, kept across batches so each
+        # worker's warp map cache survives to the next batch
+        self._executor = None
+        self._executor_workers = None
         
         # Performance tracking
         self.frames_attempted = 0
         self.frames_successful = 0
+        self._stats_lock = threading.Lock()
+        
+    def _thread_state(self) -> threading.local:
+        """
+        Decode state private to the calling thread
+        
+        Each thread gets its own warp map cache (and CUDA filter objects),
+        so decode_frames workers never see each other's corners.
+        """
+        state = self._local
+        if not hasattr(state, 'cached_maps'):
+            state.cached_maps = None
+            state.maps_on_gpu = False
+            state.last_corners = None
+            state.gpu_clahe = None
+        return state
+        
+    def _gpu_state(self) -> threading.local:
+        """Thread state with this thread's CUDA filter objects (not thread-safe either)"""
+        state = self._thread_state()
+        if state.gpu_clahe is None:
+            state.gpu_median = cv2.cuda.createMedianFilter(cv2.CV_8UC1, 3)
+            state.gpu_matcher = cv2.cuda.createTemplateMatching(cv2.CV_8UC1, cv2.TM_CCOEFF_NORMED)
+            state.gpu_templates = [self._upload(t) for t in self._finder_templates]
+            state.gpu_clahe = cv2.cuda.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        return state
+        
+    def _upload(self, image: np.ndarray) -> "cv2.cuda_GpuMat":
+        """Copy an image to the GPU"""
+        gpu_image = cv2.cuda_GpuMat()
+        gpu_image.upload(image)
+        return gpu_image
         
     def _calculate_total_symbols(self) -> int:
         """Calculate total data symbols"""
@@ -59,7 +228,10 @@ class VisualDecoder:
         return symbols
         
     def _enhance_image(self, image: np.ndarray) -> np.ndarray:
-        """Preprocessing to improve detection"""
+        """Preprocessing to improve detection (image may be a cv2.cuda_GpuMat)"""
+        if isinstance(image, cv2.cuda_GpuMat):
+            return self._enhance_image_gpu(image)
+            
         # Convert to grayscale if needed
         if len(image.shape) == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -70,11 +242,24 @@ class VisualDecoder:
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         enhanced = clahe.apply(gray)
         
-        # Bilateral filter to reduce noise while preserving edges
-        enhanced = cv2.bilateralFilter(enhanced, 9, 75, 75)
+        # Median filter to reduce noise while keeping the grid's sharp edges
+        # (much cheaper than a full-resolution bilateral filter)
+        enhanced = cv2.medianBlur(enhanced, 3)
         
         return enhanced
         
+    def _enhance_image_gpu(self, image: "cv2.cuda_GpuMat") -> "cv2.cuda_GpuMat":
+        """Same preprocessing as _enhance_image, kept on the GPU"""
+        state = self._gpu_state()
+        
+        if image.channels() == 3:
+            gray = cv2.cuda.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image
+            
+        enhanced = state.gpu_clahe.apply(gray, cv2.cuda.Stream_Null())
+        return state.gpu_median.apply(enhanced)
+        
     def _detect_finder_patterns(self, image: np.ndarray) -> List[Tuple[int, int]]:
         """
         Detect corner finder patterns
@@ -83,29 +268,30 @@ class VisualDecoder:
             List of (x, y) coordinates of finder pattern centers
         """
         # Use template matching for finder patterns
-        # Create template (simplified - actual would be more complex)
-        template = self._create_finder_template()
-        
-        # Multi-scale matching
-        scales = [0.8, 1.0, 1.2]
+        threshold = 0.6
+        nms_kernel = np.ones((7, 7), np.uint8)
         all_locations = []
         
-        for scale in scales:
-            h, w = template.shape
-            scaled_template = cv2.resize(template, 
-                                        (int(w * scale), int(h * scale)),
-                                        interpolation=cv2.INTER_AREA)
+        # Multi-scale matching with the precomputed templates
+        on_gpu = isinstance(image, cv2.cuda_GpuMat)
+        for i, scaled_template in enumerate(self._finder_templates):
+            h, w = scaled_template.shape[:2]
             
-            # Template matching
-            result = cv2.matchTemplate(image, scaled_template, cv2.TM_CCOEFF_NORMED)
+            # Template matching (only the response map leaves the GPU)
+            if on_gpu:
+                state = self._gpu_state()
+                result = state.gpu_matcher.match(image, state.gpu_templates[i]).download()
+            else:
+                result = cv2.matchTemplate(image, scaled_template, cv2.TM_CCOEFF_NORMED)
             
-            # Find peaks
-            threshold = 0.6
-            locations = np.where(result >= threshold)
+            # Find peaks: above threshold and a local maximum in a 7x7 window
+            peaks = (result >= threshold) & (result == cv2.dilate(result, nms_kernel))
+            ys, xs = np.nonzero(peaks)
             
-            for pt in zip(*locations[::-1]):
-                all_locations.append((pt[0] + w//2, pt[1] + h//2))
-                
+            all_locations.append(np.column_stack([xs + w//2, ys + h//2]))
+            
+        all_locations = np.concatenate(all_locations)
+        
         # Cluster nearby detections
         if len(all_locations) < 3:
             return []
@@ -133,31 +319,43 @@ class VisualDecoder:
         
     def _cluster_points(self, points: List[Tuple[int, int]], min_distance: int) -> List[Tuple[int, int]]:
         """Cluster nearby points and return cluster centers"""
-        if not points:
+        if len(points) == 0:
             return []
             
+        xs = [int(p[0]) for p in points]
+        ys = [int(p[1]) for p in points]
+        min_distance_sq = min_distance ** 2
+        
+        # Bucket points into min_distance-sized grid cells: any point closer
+        # than min_distance lies in the same or one of the 8 adjacent cells
+        cells = {}
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            cells.setdefault((x // min_distance, y // min_distance), []).append(i)
+            
         clusters = []
-        used = set()
+        used = [False] * len(xs)
         
-        for i, pt1 in enumerate(points):
-            if i in used:
+        for i, (x1, y1) in enumerate(zip(xs, ys)):
+            if used[i]:
                 continue
                 
-            cluster = [pt1]
-            used.add(i)
+            cluster = [i]
+            used[i] = True
+            cx, cy = x1 // min_distance, y1 // min_distance
             
-            for j, pt2 in enumerate(points):
-                if j in used:
-                    continue
-                    
-                dist = np.sqrt((pt1[0] - pt2[0])**2 + (pt1[1] - pt2[1])**2)
-                if dist < min_distance:
-                    cluster.append(pt2)
-                    used.add(j)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for j in cells.get((cx + dx, cy + dy), ()):
+                        if used[j]:
+                            continue
+                            
+                        if (x1 - xs[j])**2 + (y1 - ys[j])**2 < min_distance_sq:
+                            cluster.append(j)
+                            used[j] = True
                     
             # Cluster center
-            center_x = int(np.mean([p[0] for p in cluster]))
-            center_y = int(np.mean([p[1] for p in cluster]))
+            center_x = int(np.mean([xs[k] for k in cluster]))
+            center_y = int(np.mean([ys[k] for k in cluster]))
             clusters.append((center_x, center_y))
             
         return clusters
@@ -193,8 +391,12 @@ class VisualDecoder:
         """
         Apply perspective transform to get frontal view
         
+        Args:
+            image: Camera frame, as a NumPy array or a cv2.cuda_GpuMat
+            corners: Detected finder pattern centers
+        
         Returns:
-            Warped image or None if transform fails
+            Warped image (always a NumPy array) or None if transform fails
         """
         if len(corners) != 4:
             return None
@@ -206,7 +408,7 @@ class VisualDecoder:
         src_pts = np.array(corners, dtype=np.float32)
         
         # Destination points (square)
-        size = self.expected_module_count * 4  # 4 pixels per module
+        size = self.expected_module_count * self.pixels_per_module
         dst_pts = np.array([
             [0, 0],
             [size, 0],
@@ -214,14 +416,44 @@ class VisualDecoder:
             [0, size]
         ], dtype=np.float32)
         
-        # Compute perspective transform
+        # Reuse the remap tables if the code has not moved since the last frame
+        # (and they were built for the same backend)
+        on_gpu = isinstance(image, cv2.cuda_GpuMat)
+        state = self._thread_state()
+        if state.cached_maps is not None and state.maps_on_gpu == on_gpu:
+            # Module pitch in camera pixels, from the shortest edge of the code
+            edges = np.linalg.norm(src_pts - np.roll(src_pts, 1, axis=0), axis=1)
+            max_shift = self.corner_tolerance * edges.min() / self.expected_module_count
+            if np.abs(src_pts - state.last_corners).max() <= max_shift:
+                return self._remap(image, state.cached_maps)
+            
+        # Compute perspective transform and bake it into remap tables
         try:
             matrix = cv2.getPerspectiveTransform(src_pts, dst_pts)
-            warped = cv2.warpPerspective(image, matrix, (size, size))
-            return warped
-        except:
+            if not on_gpu:
+                maps = cv2.initUndistortRectifyMap(
+                    np.eye(3), None, matrix, np.eye(3), (size, size), cv2.CV_16SC2
+                )
+        except cv2.error:
             return None
             
+        # GPU errors propagate so that _locate_code can fall back to the CPU
+        if on_gpu:
+            maps = cv2.cuda.buildWarpPerspectiveMaps(matrix, False, (size, size))
+            
+        state.cached_maps = maps
+        state.maps_on_gpu = on_gpu
+        state.last_corners = src_pts
+        
+        return self._remap(image, maps)
+        
+    def _remap(self, image, maps) -> np.ndarray:
+        """Sample image through cached warp maps, downloading GPU results"""
+        map1, map2 = maps
+        if isinstance(image, cv2.cuda_GpuMat):
+            return cv2.cuda.remap(image, map1, map2, cv2.INTER_LINEAR).download()
+        return cv2.remap(image, map1, map2, cv2.INTER_LINEAR)
+            
     def _extract_modules(self, 
                         warped_image: np.ndarray,
                         color_mode: int = 4) -> np.ndarray:
@@ -237,117 +469,209 @@ class VisualDecoder:
         """
         module_count = self.expected_module_count
         pixels_per_module = warped_image.shape[0] // module_count
+        border = pixels_per_module // 5
         
-        modules = []
+        if njit is not None and warped_image.ndim == 3:
+            # Compiled single pass over the image
+            means = _extract_module_means(
+                np.ascontiguousarray(warped_image), self._reserved_mask, pixels_per_module
+            )
+        else:
+            # View the image as a (row, y, col, x[, channel]) grid of module tiles
+            size = module_count * pixels_per_module
+            tiles = warped_image[:size, :size].reshape(
+                (module_count, pixels_per_module, module_count, pixels_per_module)
+                + warped_image.shape[2:]
+            )
+            
+            # Average the center 60% of every module to avoid border effects
+            # (whole module at <5 pixels per module, where there is no border to trim)
+            inner = slice(border, pixels_per_module - border)
+            means = tiles[:, inner, :, inner].mean(axis=(1, 3))
+            
+            # Skip reserved areas (row-major order, same as the encoder)
+            means = means[~self._reserved_mask]
         
-        for y in range(module_count):
-            for x in range(module_count):
-                # Skip reserved areas
-                if self._is_reserved_area(x, y):
-                    continue
-                    
-                # Extract module region (center 60% to avoid border effects)
-                y_start = y * pixels_per_module + pixels_per_module // 5
-                y_end = (y + 1) * pixels_per_module - pixels_per_module // 5
-                x_start = x * pixels_per_module + pixels_per_module // 5
-                x_end = (x + 1) * pixels_per_module - pixels_per_module // 5
-                
-                module_region = warped_image[y_start:y_end, x_start:x_end]
-                
-                # Determine color
-                if len(module_region.shape) == 3:
-                    avg_color = np.mean(module_region, axis=(0, 1))
-                    module_value = self._color_to_value(avg_color, color_mode)
-                else:
-                    avg_intensity = np.mean(module_region)
-                    module_value = self._intensity_to_value(avg_intensity, color_mode)
-                    
-                modules.append(module_value)
+        # Determine color
+        if means.ndim == 2:
+            modules = self._colors_to_values(means, color_mode)
+        else:
+            modules = self._intensities_to_values(means, color_mode)
                 
         return np.array(modules, dtype=np.uint8)
         
+    def _build_reserved_mask(self) -> np.ndarray:
+        """Boolean (module_count x module_count) mask of reserved positions"""
+        # Same logic as encoder
+        mc = self.expected_module_count
+        yy, xx = np.mgrid[:mc, :mc]
+        return ((xx < 10) & (yy < 10)) | \
+               ((xx >= mc - 10) & (yy < 10)) | \
+               ((xx < 10) & (yy >= mc - 10)) | \
+               (xx == 6) | (yy == 6) | \
+               ((xx < 20) & (yy >= 10) & (yy < 18))
+        
     def _is_reserved_area(self, x: int, y: int) -> bool:
         """Check if module position is reserved"""
-        # Same logic as encoder
-        if (x < 10 and y < 10) or \
-           (x >= self.expected_module_count - 10 and y < 10) or \
-           (x < 10 and y >= self.expected_module_count - 10):
-            return True
-        if x == 6 or y == 6:
-            return True
-        if x < 20 and y >= 10 and y < 18:
-            return True
-        return False
+        return bool(self._reserved_mask[y, x])
         
     def _color_to_value(self, color: np.ndarray, color_mode: int) -> int:
-        """Map RGB color to discrete value"""
-        # Define palettes
+        """Map a BGR color to discrete value"""
+        return int(self._colors_to_values(np.asarray(color)[None], color_mode)[0])
+        
+    def _colors_to_values(self, colors: np.ndarray, color_mode: int) -> np.ndarray:
+        """
+        Map a batch of BGR colors to discrete values
+        
+        Args:
+            colors: (N, 3) array of colors
+            color_mode: Number of colors (2, 4, or 8)
+            
+        Returns:
+            (N,) array of module values
+        """
         if color_mode == 2:
             # B&W
             threshold = 128
-            return 1 if np.mean(color) > threshold else 0
-            
-        elif color_mode == 4:
-            # 4-color palette
-            palette = np.array([
-                [0, 0, 0],       # Black
-                [255, 255, 255], # White
-                [255, 0, 0],     # Red
-                [0, 0, 255],     # Blue
-            ])
-            
-        elif color_mode == 8:
-            # 8-color palette
-            palette = np.array([
-                [0, 0, 0], [255, 255, 255],
-                [255, 0, 0], [0, 255, 0], [0, 0, 255],
-                [255, 255, 0], [255, 0, 255], [0, 255, 255],
-            ])
-        else:
-            return 0
+            return (colors.mean(axis=1) > threshold).astype(np.uint8)
+            
+        if color_mode not in self._palettes:
+            return np.zeros(len(colors), dtype=np.uint8)
             
-        # Find closest palette color
-        distances = np.sum((palette - color) ** 2, axis=1)
-        return np.argmin(distances)
+        # Find closest palette color in LAB for every module at once
+        palette = self._lab_palettes[color_mode]
+        lab = self._to_lab(colors)
+        distances = ((lab[:, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1).astype(np.uint8)
+        
+    def _to_lab(self, colors: np.ndarray) -> np.ndarray:
+        """Convert (N, 3) colors in 0-255 (same channel order as the palettes) to CIELAB"""
+        # Float input keeps the fractional part of module means
+        scaled = (np.asarray(colors, dtype=np.float32) / 255.0).reshape(1, -1, 3)
+        return cv2.cvtColor(scaled, cv2.COLOR_BGR2LAB).reshape(-1, 3)
         
     def _intensity_to_value(self, intensity: float, color_mode: int) -> int:
         """Map grayscale intensity to discrete value"""
-        # Simple threshold-based
-        thresholds = {
-            2: [128],
-            4: [64, 128, 192],
-            8: [32, 64, 96, 128, 160, 192, 224]
-        }
+        return int(self._intensities_to_values(np.asarray([intensity]), color_mode)[0])
         
-        if color_mode not in thresholds:
-            return 0
+    def _intensities_to_values(self, intensities: np.ndarray, color_mode: int) -> np.ndarray:
+        """
+        Map a batch of grayscale intensities to discrete values
+        
+        Args:
+            intensities: (N,) array of intensities
+            color_mode: Number of colors (2, 4, or 8)
             
-        for i, threshold in enumerate(thresholds[color_mode]):
-            if intensity < threshold:
-                return i
-                
-        return color_mode - 1
+        Returns:
+            (N,) array of module values
+        """
+        if color_mode not in self._intensity_thresholds:
+            return np.zeros(len(intensities), dtype=np.uint8)
+            
+        # Value = number of thresholds at or below the intensity
+        thresholds = self._intensity_thresholds[color_mode]
+        return np.searchsorted(thresholds, intensities, side='right').astype(np.uint8)
         
     def _modules_to_data(self, modules: np.ndarray, bits_per_module: int) -> bytes:
         """Convert module values back to bytes"""
-        bits = []
-        
-        for module in modules:
-            # Convert to binary
-            module_bits = format(int(module), f'0{bits_per_module}b')
-            bits.append(module_bits)
-            
-        # Combine into byte string
-        bit_string = ''.join(bits)
-        
-        # Convert to bytes
-        data = bytearray()
-        for i in range(0, len(bit_string), 8):
-            byte_bits = bit_string[i:i+8]
-            if len(byte_bits) == 8:
-                data.append(int(byte_bits, 2))
+        if njit is not None:
+            return _modules_to_bytes(np.asarray(modules, dtype=np.uint8), bits_per_module).tobytes()
+            
+        # Expand each module value into its bits (MSB first)
+        shifts = np.arange(bits_per_module - 1, -1, -1)
+        bits = ((np.asarray(modules, dtype=np.uint8)[:, None] >> shifts) & 1).astype(np.uint8)
+        bits = bits.ravel()
+        
+        # Pack complete bytes only
+        usable = len(bits) - len(bits) % 8
+        return np.packbits(bits[:usable]).tobytes()
+        
+    def _rs_decode(self, encoded_data: bytearray) -> Optional[Tuple[bytearray, int]]:
+        """
+        Reed-Solomon decode, skipping error correction for clean codewords
+        
+        Each RS chunk whose syndromes are all zero is error-free, so its
+        message is taken as-is. For the others the same syndromes feed the
+        error locator (Berlekamp-Massey). rs_find_error_locator raises
+        when the locator degree exceeds nsym // 2, so frames with an
+        uncorrectable chunk are rejected before the Chien search and
+        Forney correction.
+        
+        Returns:
+            (decoded message, number of corrected symbols), or None if
+            the data cannot be corrected
+        """
+        codec = self.rs_codec
+        nsym = codec.nsym
+        decoded = bytearray()
+        error_count = 0
+        
+        for start in range(0, len(encoded_data), codec.nsize):
+            chunk = encoded_data[start:start + codec.nsize]
+            if len(chunk) <= nsym:
+                # Too short to carry any message bytes
+                return None
                 
-        return bytes(data)
+            syndromes = rs_calc_syndromes(chunk, nsym, codec.fcr, codec.generator)
+            
+            if max(syndromes) == 0:
+                decoded.extend(chunk[:-nsym])
+                continue
+                
+            # Same steps as RSCodec.decode, but reusing the syndromes above
+            try:
+                # Raises ReedSolomonError when the locator degree shows more
+                # errors than the parity can correct
+                err_loc = rs_find_error_locator(syndromes, nsym)
+                err_pos = rs_find_errors(err_loc[::-1], len(chunk), codec.generator)
+                if err_pos is None:
+                    return None
+                    
+                corrected = rs_correct_errata(chunk, syndromes, err_pos, codec.fcr, codec.generator)
+            except ReedSolomonError:
+                # Too many errors, or locator roots not found by the Chien search
+                return None
+                
+            # Check the repaired codeword, as RSCodec.decode does
+            if max(rs_calc_syndromes(corrected, nsym, codec.fcr, codec.generator)) > 0:
+                return None
+                
+            decoded.extend(corrected[:-nsym])
+            error_count += len(err_pos)
+                
+        return decoded, error_count
+        
+    def _locate_code(self, camera_image: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Find the code in a camera frame and warp it to a frontal view
+        
+        Runs on the GPU when enabled; if any CUDA call fails (e.g. out of
+        device memory) the frame is processed again on the CPU.
+        
+        Returns:
+            Warped image or None if no code was found
+        """
+        if self.use_gpu:
+            try:
+                # Upload once; every step then stays on the GPU
+                return self._front_end(self._upload(camera_image))
+            except cv2.error:
+                pass
+                
+        return self._front_end(camera_image)
+        
+    def _front_end(self, image) -> Optional[np.ndarray]:
+        """Enhance, detect finder patterns and warp (NumPy array or cv2.cuda_GpuMat)"""
+        # 1. Enhance image
+        enhanced = self._enhance_image(image)
+        
+        # 2. Detect finder patterns
+        corners = self._detect_finder_patterns(enhanced)
+        if len(corners) < 3:
+            return None
+            
+        # 3. Perspective transform
+        return self._perspective_transform(image, corners)
         
     def decode_frame(self, 
                     camera_image: np.ndarray,
@@ -365,18 +689,11 @@ class VisualDecoder:
         import time
         start_time = time.time()
         
-        self.frames_attempted += 1
+        with self._stats_lock:
+            self.frames_attempted += 1
         
-        # 1. Enhance image
-        enhanced = self._enhance_image(camera_image)
-        
-        # 2. Detect finder patterns
-        corners = self._detect_finder_patterns(enhanced)
-        if len(corners) < 3:
-            return None
-            
-        # 3. Perspective transform
-        warped = self._perspective_transform(camera_image, corners)
+        # 1-3. Enhance, detect finder patterns, perspective transform
+        warped = self._locate_code(camera_image)
         if warped is None:
             return None
             
@@ -388,12 +705,11 @@ class VisualDecoder:
         encoded_data = self._modules_to_data(modules, bits_per_module)
         
         # 6. Reed-Solomon decode
-        try:
-            decoded_data, corrected_errors = self.rs_codec.decode(encoded_data)
-            error_count = len(corrected_errors) if isinstance(corrected_errors, list) else 0
-        except:
+        rs_result = self._rs_decode(bytearray(encoded_data))
+        if rs_result is None:
             # Decoding failed
             return None
+        decoded_data, error_count = rs_result
             
         # 7. Extract metadata (simplified - actual would parse from reserved area)
         # For now, assume metadata is prepended
@@ -409,7 +725,8 @@ class VisualDecoder:
         
         decode_time = (time.time() - start_time) * 1000
         
-        self.frames_successful += 1
+        with self._stats_lock:
+            self.frames_successful += 1
         
         return DecodedFrame(
             frame_id=frame_id,
@@ -420,6 +737,48 @@ class VisualDecoder:
             decode_time_ms=decode_time
         )
         
+    def decode_frames(self,
+                      camera_images: List[np.ndarray],
+                      color_mode: int = 4,
+                      max_workers: Optional[int] = None) -> List[Optional[DecodedFrame]]:
+        """
+        Decode a batch of camera frames in parallel
+        
+        OpenCV releases the GIL in its C++ kernels, so frames are decoded
+        on a thread pool. OpenCV's thread count is process-wide state and
+        is left alone here; for best throughput the application can call
+        cv2.setNumThreads(1) while it decodes batches, so OpenCV's own
+        threads do not compete with the pool for cores.
+        
+        The pool is kept between calls, so each worker reuses its warp
+        maps on the next batch while the code stays put; call close()
+        when done decoding.
+        
+        Args:
+            camera_images: Raw camera frames (BGR or grayscale)
+            color_mode: Expected color depth (2, 4, or 8)
+            max_workers: Worker threads (default: CPU count)
+            
+        Returns:
+            DecodedFrame or None for each image, in input order
+        """
+        workers = max_workers or os.cpu_count()
+        if self._executor is None or self._executor_workers != workers:
+            self.close()
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+            self._executor_workers = workers
+            
+        return list(self._executor.map(
+            lambda image: self.decode_frame(image, color_mode), camera_images
+        ))
+        
+    def close(self):
+        """Shut down the decode_frames worker pool, if one was started"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_workers = None
+            
     def get_success_rate(self) -> float:
         """Get frame decode success rate"""
         if self.frames_attempted == 0:
@@ -4,10 +4,13 @@ Generates JAB Code-based color QR codes with advanced error correction
 """
 
 import numpy as np
-import cv2
 from typing import Tuple, List
 from enum import Enum
-from reedsolo import RSCodec
+from color_palettes import ordered_palette, black_index, white_index
+try:
+    from creedsolo import RSCodec  # Cython build of reedsolo, much faster
+except ImportError:
+    from reedsolo import RSCodec
 
 
 class EncodingMode(Enum):
@@ -52,34 +55,33 @@ class VisualEncoder:
             EncodingMode.ROBUST: self._generate_2_color_palette()
         }
         
+        # Module values of black and white, used by the structural patterns
+        self._black = black_index(mode.colors)
+        self._white = white_index(mode.colors)
+        
+        # Reserved (non-data) module positions, indexed [y, x]
+        self._reserved_mask = self._build_reserved_mask()
+        
+        # (y, x) coordinates of data modules in fill order (row-major)
+        self._data_slots = np.argwhere(~self._reserved_mask)
+        
+        # Structural patterns as palette indices, stamped into every frame
+        self._finder_block = self._build_finder_block()
+        self._timing_row = self._build_timing_row()
+        
     def _generate_8_color_palette(self) -> np.ndarray:
         """8-color palette optimized for smartphone cameras"""
-        return np.array([
-            [0, 0, 0],       # Black
-            [255, 255, 255], # White
-            [255, 0, 0],     # Red
-            [0, 255, 0],     # Green
-            [0, 0, 255],     # Blue
-            [255, 255, 0],   # Yellow
-            [255, 0, 255],   # Magenta
-            [0, 255, 255],   # Cyan
-        ], dtype=np.uint8)
+        # Black, white, blue, cyan, red, yellow, magenta, green (BGR) in bit-error-minimizing order
+        return ordered_palette(8)
         
     def _generate_4_color_palette(self) -> np.ndarray:
         """4-color palette with high contrast"""
-        return np.array([
-            [0, 0, 0],       # Black
-            [255, 255, 255], # White
-            [255, 0, 0],     # Red
-            [0, 0, 255],     # Blue
-        ], dtype=np.uint8)
+        # Black, white, blue, red (BGR) in bit-error-minimizing order
+        return ordered_palette(4)
         
     def _generate_2_color_palette(self) -> np.ndarray:
         """Standard B&W palette"""
-        return np.array([
-            [0, 0, 0],       # Black
-            [255, 255, 255], # White
-        ], dtype=np.uint8)
+        return ordered_palette(2)
         
     def _calculate_total_symbols(self) -> int:
         """Calculate total data symbols available"""
@@ -93,52 +95,59 @@ class VisualEncoder:
         
         return symbols
         
-    def _add_finder_patterns(self, frame: np.ndarray) -> np.ndarray:
-        """Add corner finder patterns (similar to QR codes)"""
+    def _build_finder_block(self) -> np.ndarray:
+        """Finder pattern (7x7 with border) as a (10, 10) palette index block"""
         pattern_size = 10
-        white = self.color_palettes[self.mode][1]
-        black = self.color_palettes[self.mode][0]
+        white, black = self._white, self._black
         
-        # Create finder pattern (7x7 with border)
-        finder = np.zeros((pattern_size, pattern_size, 3), dtype=np.uint8)
-        finder[:, :] = white
+        finder = np.full((pattern_size, pattern_size), white, dtype=np.uint8)
         finder[1:9, 1:9] = black
         finder[2:8, 2:8] = white
         finder[3:7, 3:7] = black
         
+        return finder
+        
+    def _build_timing_row(self) -> np.ndarray:
+        """Alternating timing pattern indices for modules 10..module_count-11"""
+        white, black = self._white, self._black
+        
+        # Module 10 (even) is white
+        length = self.module_count - 20
+        return np.tile(np.array([white, black], dtype=np.uint8), length // 2 + 1)[:length]
+        
+    def _add_finder_patterns(self, color_idx: np.ndarray) -> np.ndarray:
+        """Add corner finder patterns (similar to QR codes) to a palette index grid"""
+        pattern_size = 10
+        finder = self._finder_block
+        
         # Top-left
-        frame[0:pattern_size, 0:pattern_size] = finder
+        color_idx[0:pattern_size, 0:pattern_size] = finder
         
         # Top-right
-        frame[0:pattern_size, -pattern_size:] = finder
+        color_idx[0:pattern_size, -pattern_size:] = finder
         
         # Bottom-left
-        frame[-pattern_size:, 0:pattern_size] = finder
+        color_idx[-pattern_size:, 0:pattern_size] = finder
         
         # Center (for large codes)
         if self.module_count > 150:
             center = self.module_count // 2
             offset = pattern_size // 2
-            frame[center-offset:center+offset, center-offset:center+offset] = finder[:pattern_size//2, :pattern_size//2]
+            color_idx[center-offset:center+offset, center-offset:center+offset] = finder[:pattern_size//2, :pattern_size//2]
         
-        return frame
+        return color_idx
         
-    def _add_timing_patterns(self, frame: np.ndarray) -> np.ndarray:
-        """Add alternating timing patterns"""
-        white = self.color_palettes[self.mode][1]
-        black = self.color_palettes[self.mode][0]
+    def _add_timing_patterns(self, color_idx: np.ndarray) -> np.ndarray:
+        """Add alternating timing patterns to a palette index grid"""
+        mc = self.module_count
         
         # Horizontal timing (row 6)
-        for i in range(10, self.module_count - 10):
-            color = white if i % 2 == 0 else black
-            frame[6, i] = color
-            
+        color_idx[6, 10:mc - 10] = self._timing_row
+        
         # Vertical timing (column 6)
-        for i in range(10, self.module_count - 10):
-            color = white if i % 2 == 0 else black
-            frame[i, 6] = color
+        color_idx[10:mc - 10, 6] = self._timing_row
             
-        return frame
+        return color_idx
         
     def _encode_metadata(self, frame_id: int, total_frames: int, data_length: int) -> bytes:
         """Encode frame metadata"""
@@ -156,18 +165,14 @@ class VisualEncoder:
     def _data_to_modules(self, data: bytes) -> np.ndarray:
         """Convert byte data to color module values"""
         bits_per_module = self.mode.bits_per_module
-        module_values = []
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
         
-        bit_string = ''.join(format(byte, '08b') for byte in data)
-        
-        # Group bits by module size
-        for i in range(0, len(bit_string), bits_per_module):
-            chunk = bit_string[i:i + bits_per_module]
-            if len(chunk) == bits_per_module:
-                value = int(chunk, 2)
-                module_values.append(value)
+        # Group bits by module size (a trailing partial group is dropped)
+        count = len(bits) // bits_per_module
+        groups = bits[:count * bits_per_module].reshape(count, bits_per_module)
+        weights = 1 << np.arange(bits_per_module - 1, -1, -1)
                 
-        return np.array(module_values, dtype=np.uint8)
+        return (groups @ weights).astype(np.uint8)
         
     def encode_frame(self, 
                      data: bytes, 
@@ -182,7 +187,7 @@ class VisualEncoder:
             total_frames: Total number of frames in transmission
             
         Returns:
-            RGB image as numpy array (module_count x module_count x 3)
+            BGR image as numpy array (module_count x module_count x 3)
         """
         # Calculate capacity
         total_symbols = self._calculate_total_symbols()
@@ -195,95 +200,87 @@ class VisualEncoder:
             data = data + b'\x00' * (data_symbols - len(data))
             
         # Add Reed-Solomon error correction
-        encoded_data = self.rs_codec.encode(data)
+        encoded_data = self.rs_codec.encode(bytearray(data))
         
         # Convert to module values
         modules = self._data_to_modules(encoded_data)
         
-        # Create frame image
-        frame = np.zeros((self.module_count, self.module_count, 3), dtype=np.uint8)
+        # Build the frame as a grid of palette indices (black background)
+        color_idx = np.full((self.module_count, self.module_count), self._black, dtype=np.uint8)
         
         # Fill data area (skip reserved areas)
-        palette = self.color_palettes[self.mode]
-        module_idx = 0
-        
-        for y in range(self.module_count):
-            for x in range(self.module_count):
-                # Skip finder pattern areas
-                if self._is_reserved_area(x, y):
-                    continue
-                    
-                if module_idx < len(modules):
-                    color_idx = modules[module_idx]
-                    frame[y, x] = palette[color_idx]
-                    module_idx += 1
+        count = min(len(modules), len(self._data_slots))
+        ys, xs = self._data_slots[:count, 0], self._data_slots[:count, 1]
+        color_idx[ys, xs] = modules[:count]
                     
         # Add structural patterns
-        frame = self._add_finder_patterns(frame)
-        frame = self._add_timing_patterns(frame)
+        color_idx = self._add_finder_patterns(color_idx)
+        color_idx = self._add_timing_patterns(color_idx)
         
         # Add metadata in top-left reserved area (after finder pattern)
         metadata = self._encode_metadata(frame_id, total_frames, len(data))
-        self._embed_metadata(frame, metadata)
+        self._embed_metadata(color_idx, metadata)
         
-        return frame
+        # Single palette lookup produces the whole BGR frame
+        return self.color_palettes[self.mode][color_idx]
+        
+    def _build_reserved_mask(self) -> np.ndarray:
+        """Boolean (module_count x module_count) mask of reserved positions"""
+        mc = self.module_count
+        yy, xx = np.mgrid[:mc, :mc]
         
-    def _is_reserved_area(self, x: int, y: int) -> bool:
-        """Check if module position is reserved for patterns"""
         # Finder patterns (corners + center)
-        if (x < 10 and y < 10) or \
-           (x >= self.module_count - 10 and y < 10) or \
-           (x < 10 and y >= self.module_count - 10):
-            return True
-            
+        finder = ((xx < 10) & (yy < 10)) | \
+                 ((xx >= mc - 10) & (yy < 10)) | \
+                 ((xx < 10) & (yy >= mc - 10))
+                 
         # Timing patterns
-        if x == 6 or y == 6:
-            return True
-            
+        timing = (xx == 6) | (yy == 6)
+        
         # Metadata area
-        if x < 20 and y >= 10 and y < 18:
-            return True
-            
-        return False
-        
-    def _embed_metadata(self, frame: np.ndarray, metadata: bytes):
-        """Embed metadata in reserved area with high redundancy"""
-        # Use simple 8x repetition for critical metadata
-        palette = self.color_palettes[self.mode]
-        
-        x_start, y_start = 10, 10
-        for byte in metadata:
-            for bit_pos in range(8):
-                bit = (byte >> (7 - bit_pos)) & 1
-                color = palette[bit]
-                
-                # Write bit multiple times for redundancy
-                for dx in range(2):
-                    for dy in range(2):
-                        if x_start + dx < 20 and y_start + dy < 18:
-                            frame[y_start + dy, x_start + dx] = color
-                            
-                x_start += 2
-                if x_start >= 20:
-                    x_start = 10
-                    y_start += 2
+        metadata = (xx < 20) & (yy >= 10) & (yy < 18)
+        
+        return finder | timing | metadata
+        
+    def _is_reserved_area(self, x: int, y: int) -> bool:
+        """Check if module position is reserved for patterns"""
+        return bool(self._reserved_mask[y, x])
+        
+    def _embed_metadata(self, color_idx: np.ndarray, metadata: bytes):
+        """Embed metadata in reserved area of a palette index grid with high redundancy"""
+        # Use simple 2x2 repetition for critical metadata. The area at
+        # [10:18, 10:20] holds 4 rows of 5 bit cells, so only the first
+        # 20 bits (MSB first) fit
+        bits = np.unpackbits(np.frombuffer(metadata, dtype=np.uint8))
+        bit_grid = bits[:20].reshape(4, 5)
+        
+        # Write each bit as a 2x2 block, 0 = black and 1 = white
+        pix = np.kron(bit_grid, np.ones((2, 2), dtype=np.uint8))
+        bit_colors = np.array([self._black, self._white], dtype=np.uint8)
+        color_idx[10:10 + pix.shape[0], 10:10 + pix.shape[1]] = bit_colors[pix]
                     
-    def render_for_display(self, frame: np.ndarray, scale: int = 4) -> np.ndarray:
+    def render_for_display(self,
+                           frame: np.ndarray,
+                           scale: int = 4,
+                           out: np.ndarray = None) -> np.ndarray:
         """
         Scale up frame for display on screen
         
         Args:
             frame: Encoded frame (module_count x module_count x 3)
             scale: Pixel scale factor (larger = easier to decode)
+            out: Optional reusable uint8 buffer of the upscaled shape
             
         Returns:
-            Upscaled image ready for display
+            Upscaled image ready for display (out, if given)
         """
+        import cv2  # Only needed for display rendering
+        
         height, width = frame.shape[:2]
         new_size = (width * scale, height * scale)
         
         # Nearest neighbor to preserve sharp module boundaries
-        display_frame = cv2.resize(frame, new_size, interpolation=cv2.INTER_NEAREST)
+        display_frame = cv2.resize(frame, new_size, dst=out, interpolation=cv2.INTER_NEAREST)
         
         return display_frame
         
@@ -321,6 +318,8 @@ class FrameSequenceEncoder:
 
 # Example usage
 if __name__ == "__main__":
+    import cv2
+    
     # Create encoder
     encoder = VisualEncoder(
         mode=EncodingMode.BALANCED,